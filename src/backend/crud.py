@@ -1,3 +1,4 @@
+from typing import Dict, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 from src.backend.models import (
     EvaluationExperiment,
@@ -53,6 +54,33 @@ def add_fine_tuning_metric(db: Session, experiment_id: str, metric_name: str, me
     db.refresh(metric)
     return metric
 
+def add_fine_tuning_metrics(db: Session, experiment_id: str, metrics: List[Dict]):
+    """Insert many step metrics for one fine-tuning experiment in a single transaction.
+
+    Each item in `metrics` holds 'step', 'metric_name' and 'metric_value'.
+    """
+    rows = [
+        FineTuningMetric(
+            experiment_id=experiment_id,
+            step=metric["step"],
+            metric_name=metric["metric_name"],
+            metric_value=metric["metric_value"],
+        )
+        for metric in metrics
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+def get_fine_tuning_metric_keys(db: Session, experiment_id: str) -> Set[Tuple[Optional[int], str]]:
+    """Return the (step, metric_name) pairs already stored for a fine-tuning experiment."""
+    rows = (
+        db.query(FineTuningMetric.step, FineTuningMetric.metric_name)
+        .filter(FineTuningMetric.experiment_id == experiment_id)
+        .all()
+    )
+    return {(step, metric_name) for step, metric_name in rows}
+
 def add_llm_response(db: Session, experiment_id: str, input_id: str, model_response: str):
     response = LLMResponse(
         experiment_id=experiment_id,
@@ -63,3 +91,44 @@ def add_llm_response(db: Session, experiment_id: str, input_id: str, model_respo
     db.commit()
     db.refresh(response)
     return response
+
+def add_llm_responses(db: Session, experiment_id: str, responses: List[Dict[str, str]]):
+    """Insert many responses for one experiment in a single transaction.
+
+    Each item in `responses` holds 'input_id' and 'model_response'.
+    """
+    rows = [
+        LLMResponse(
+            experiment_id=experiment_id,
+            input_id=response["input_id"],
+            model_response=response["model_response"],
+        )
+        for response in responses
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+def add_evaluation_metrics(db: Session, experiment_id: str, metrics: Dict[str, float]):
+    """Insert several named metrics for one experiment in a single transaction."""
+    rows = [
+        EvaluationMetric(
+            experiment_id=experiment_id,
+            metric_name=metric_name,
+            metric_value=metric_value,
+        )
+        for metric_name, metric_value in metrics.items()
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+def get_evaluation_metrics(db: Session, experiment_id: str) -> Dict[str, float]:
+    """Return the latest value of every metric logged for an experiment."""
+    rows = (
+        db.query(EvaluationMetric)
+        .filter(EvaluationMetric.experiment_id == experiment_id)
+        .order_by(EvaluationMetric.created_at, EvaluationMetric.id)
+        .all()
+    )
+    return {row.metric_name: row.metric_value for row in rows}
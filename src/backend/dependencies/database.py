@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from src.backend.models import Base
 from src.backend.core.init_settings import global_settings as settings
@@ -19,4 +19,32 @@ def init_db():
     # Check if tables are already created (assuming there's at least one table)
     if not os.path.exists("./dev.db"):
         Base.metadata.create_all(bind=sync_engine)
-        print("Database initiate successfully!")
\ No newline at end of file
+        print("Database initiate successfully!")
+
+    # Databases created before a model change are missing its new columns
+    add_missing_columns(sync_engine)
+
+def add_missing_columns(engine):
+    """
+    Add columns that exist on the models but not in the database tables.
+
+    Only nullable columns can be added in place; a missing non-nullable column raises
+    so the failure shows up at startup instead of on the first query.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                if not column.nullable:
+                    raise RuntimeError(
+                        f"Column '{table.name}.{column.name}' is missing and cannot be added automatically; "
+                        "recreate the database."
+                    )
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"Added missing column {table.name}.{column.name}.")
\ No newline at end of file
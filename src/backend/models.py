@@ -55,6 +55,7 @@ class FineTuningMetric(Base):
     __tablename__ = "fine_tuning_metrics"
     id = Column(Integer, primary_key=True, autoincrement=True)
     experiment_id = Column(UUID(as_uuid=True), ForeignKey("fine_tuning_experiments.id"))
+    step = Column(Integer, nullable=True)  # Training step the metric was reported at, if any
     metric_name = Column(String, nullable=False)  # Name of the metric, e.g., "training_loss"
     metric_value = Column(Float, nullable=False)  # Value of the metric, e.g., 0.02 for loss
     created_at = Column(DateTime, nullable=False, default=func.now())
@@ -0,0 +1,55 @@
+"""
+Run the offline microbenchmark suite.
+
+Usage:
+    python -m src.benchmark --size 1000 --rounds 5
+    python -m src.benchmark --baseline results/benchmarks/benchmark_<timestamp>.json --threshold 0.2
+
+The suite runs fully offline: tiktoken reads the encoding from src/benchmark/tiktoken_cache
+(unless TIKTOKEN_CACHE_DIR is set). Benchmarks that need a missing encoding are reported as
+skipped; populate the cache once with network access using
+    python -m src.benchmark --prepare-tiktoken-cache
+and commit the file.
+"""
+import argparse
+import json
+import sys
+
+from src.benchmark.suite import BENCHMARKS, compare_to_baseline, run_benchmarks, save_results
+from src.benchmark.tiktoken_cache import prepare_cache, use_bundled_cache
+
+
+def main():
+    use_bundled_cache()
+
+    parser = argparse.ArgumentParser(description="Benchmark the data and LLM hot paths on synthetic data.")
+    parser.add_argument("--size", type=int, default=1_000, help="Number of synthetic examples per benchmark")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--output-dir", default="./results/benchmarks", help="Directory for the JSON results")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown before failing")
+    parser.add_argument("--prepare-tiktoken-cache", action="store_true", help="Download the tiktoken encodings into the bundled cache and exit")
+    args = parser.parse_args()
+
+    if args.prepare_tiktoken_cache:
+        prepare_cache()
+        return
+
+    results = run_benchmarks(size=args.size, rounds=args.rounds, names=args.only)
+    save_results(results, args.output_dir)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print("Performance regressions detected:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No performance regressions.")
+
+
+if __name__ == "__main__":
+    main()
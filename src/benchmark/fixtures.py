@@ -0,0 +1,85 @@
+import random
+import uuid
+from typing import Dict, List
+
+from datasets import Dataset
+
+from src.llm.prompt.base_templates import TEXT_PROMPT_TEMPLATE_ZH_V1
+
+# Common Traditional Chinese characters and punctuation used to build synthetic text
+_CHARACTERS = (
+    "臺灣的歷史文化地理政治經濟社會習俗當前事件請確保你回答準確且符合當地背景"
+    "問題選擇題考題答案其中一個選項學生老師學校國家語言資訊關於包括但不限於"
+    "人民生活環境發展教育科技醫療法律制度農業工業商業交通城市鄉村山海河流"
+)
+_PUNCTUATION = "，。、；：？！"
+_SUBJECTS = [
+    "AST_chinese", "AST_mathematics", "AST_biology", "AST_chemistry", "AST_physics",
+    "GSAT_history", "GSAT_geography", "GSAT_civics", "CAP_chinese", "driving_rule",
+]
+_DATASET_NAMES = ["sharegpt", "alpaca", "dolly", "flan"]
+
+
+def make_text(rng: random.Random, min_length: int = 20, max_length: int = 200) -> str:
+    """Generate a synthetic Traditional Chinese passage."""
+    length = rng.randint(min_length, max_length)
+    chars = []
+    for _ in range(length):
+        if chars and rng.random() < 0.08:
+            chars.append(rng.choice(_PUNCTUATION))
+        else:
+            chars.append(rng.choice(_CHARACTERS))
+    return "".join(chars)
+
+
+def make_tmlu_examples(size: int, seed: int = 0) -> List[Dict]:
+    """Generate rows shaped like the TMLU test split (before 'user_content' is added)."""
+    rng = random.Random(seed)
+    examples = []
+    for _ in range(size):
+        num_options = rng.choice([4, 4, 4, 5, 6])
+        example = {
+            "question": make_text(rng, 20, 120),
+            "subject": rng.choice(_SUBJECTS),
+            "answer": rng.choice("ABCDEF"[:num_options]),
+        }
+        for option in "ABCDEF":
+            example[option] = make_text(rng, 2, 20) if option in "ABCDEF"[:num_options] else None
+        examples.append(example)
+    return examples
+
+
+def make_fine_tune_examples(size: int, seed: int = 0) -> List[Dict]:
+    """Generate rows shaped like the transformed TaiwanChat dataset."""
+    rng = random.Random(seed)
+    examples = []
+    for _ in range(size):
+        messages = []
+        for _ in range(rng.randint(1, 3)):
+            messages.append({"role": "user", "content": make_text(rng, 10, 150)})
+            messages.append({"role": "assistant", "content": make_text(rng, 50, 400)})
+        examples.append({
+            "dataset_name": rng.choice(_DATASET_NAMES),
+            "messages": messages,
+            "instance_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        })
+    return examples
+
+
+def make_openai_inputs(size: int, seed: int = 0) -> List[Dict]:
+    """Generate fine-tuning examples already wrapped with the system prompt."""
+    system_message = {"role": "system", "content": TEXT_PROMPT_TEMPLATE_ZH_V1}
+    return [
+        {"messages": [system_message] + example["messages"]}
+        for example in make_fine_tune_examples(size, seed)
+    ]
+
+
+def make_tmlu_dataset(size: int, seed: int = 0) -> Dataset:
+    """TMLU-shaped rows as a Hugging Face `Dataset`, the type the pipeline iterates over."""
+    return Dataset.from_list(make_tmlu_examples(size, seed))
+
+
+def make_fine_tune_dataset(size: int, seed: int = 0) -> Dataset:
+    """TaiwanChat-shaped rows as a Hugging Face `Dataset`, the type the pipeline iterates over."""
+    return Dataset.from_list(make_fine_tune_examples(size, seed))
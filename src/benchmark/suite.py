@@ -0,0 +1,201 @@
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from src.benchmark.fixtures import (
+    make_fine_tune_dataset,
+    make_fine_tune_examples,
+    make_openai_inputs,
+    make_tmlu_dataset,
+    make_tmlu_examples,
+)
+from src.benchmark.tiktoken_cache import MissingEncodingError, require_encoding
+
+# Registered benchmarks: name -> setup(size) returning the zero-argument callable to time
+BENCHMARKS: Dict[str, Callable[[int], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark. The decorated setup function is excluded from the timing."""
+    def decorator(setup: Callable[[int], Callable[[], object]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+@benchmark("num_tokens_from_messages")
+def bench_num_tokens_from_messages(size: int):
+    from src.data_processor.message_handler import num_tokens_from_messages
+    require_encoding("o200k_base")
+    inputs = make_openai_inputs(size)
+    return lambda: [num_tokens_from_messages(example["messages"]) for example in inputs]
+
+
+@benchmark("is_valid_openai_example")
+def bench_is_valid_openai_example(size: int):
+    from src.data_processor.message_handler import is_valid_openai_example
+    inputs = make_openai_inputs(size)
+    return lambda: [is_valid_openai_example(example) for example in inputs]
+
+
+@benchmark("format_fine_tune_dataset_as_openai_input")
+def bench_format_fine_tune_dataset_as_openai_input(size: int):
+    from src.data_processor.message_handler import format_fine_tune_dataset_as_openai_input
+    examples = make_fine_tune_dataset(size)
+    return lambda: format_fine_tune_dataset_as_openai_input(examples)
+
+
+@benchmark("format_fine_tune_dataset_as_openai_input_with_threshold")
+def bench_format_with_threshold(size: int):
+    from src.data_processor.message_handler import format_fine_tune_dataset_as_openai_input_with_threshold
+    require_encoding("o200k_base")
+    examples = make_fine_tune_dataset(size)
+    return lambda: format_fine_tune_dataset_as_openai_input_with_threshold(examples, M_token_threshold=1_000)
+
+
+@benchmark("format_dataset_as_messages")
+def bench_format_dataset_as_messages(size: int):
+    from src.data_loader.tmlu_loader import TMLUDataLoader
+    from src.data_processor.message_handler import format_dataset_as_messages
+    loader = TMLUDataLoader("miulab/tmlu")
+    dataset_dict = {"test": make_tmlu_dataset(size).map(loader.create_user_prompt)}
+    return lambda: format_dataset_as_messages(dataset_dict)
+
+
+@benchmark("create_user_prompt")
+def bench_create_user_prompt(size: int):
+    from src.data_loader.tmlu_loader import TMLUDataLoader
+    loader = TMLUDataLoader("miulab/tmlu")
+    examples = make_tmlu_examples(size)
+    return lambda: [loader.create_user_prompt(example) for example in examples]
+
+
+def _in_memory_session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.backend.crud import add_evaluation_experiment
+    from src.backend.models import Base
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    experiment = add_evaluation_experiment(db, "benchmark", "benchmark", "benchmark")
+    return db, experiment
+
+
+@benchmark("crud.add_llm_response")
+def bench_add_llm_response(size: int):
+    from src.backend.crud import add_llm_response
+    db, experiment = _in_memory_session()
+    responses = [example["messages"][-1]["content"] for example in make_fine_tune_examples(size)]
+    return lambda: [add_llm_response(db, experiment.id, str(idx), text) for idx, text in enumerate(responses)]
+
+
+@benchmark("crud.add_llm_responses")
+def bench_add_llm_responses(size: int):
+    from src.backend.crud import add_llm_responses
+    db, experiment = _in_memory_session()
+    responses = [
+        {"input_id": str(idx), "model_response": example["messages"][-1]["content"]}
+        for idx, example in enumerate(make_fine_tune_examples(size))
+    ]
+    return lambda: add_llm_responses(db, experiment.id, responses)
+
+
+def run_benchmarks(size: int = 1_000, rounds: int = 5, names: Optional[List[str]] = None) -> Dict:
+    """
+    Time every selected benchmark.
+
+    Args:
+        size (int): Number of synthetic examples per benchmark.
+        rounds (int): Timed repetitions; setup runs before each repetition and is not timed.
+        names (List[str]): Subset of benchmarks to run; defaults to all of them.
+
+    Returns:
+        Dict: Run metadata and, per benchmark, min/median/mean seconds over the rounds. Benchmarks
+        whose tiktoken encoding is not cached are recorded as {"skipped": reason} instead.
+    """
+    selected = names or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {unknown}. Available: {list(BENCHMARKS)}")
+
+    results = {}
+    for name in selected:
+        timings = []
+        try:
+            for _ in range(rounds):
+                func = BENCHMARKS[name](size)
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+        except MissingEncodingError as e:
+            # Token benchmarks cannot run offline without the encoding; keep going with the rest
+            print(f"Warning: {name} skipped: {e}")
+            results[name] = {"skipped": str(e)}
+            continue
+        results[name] = {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.mean(timings),
+            "rounds": rounds,
+        }
+        print(f"{name:<60} median {results[name]['median'] * 1000:10.2f} ms  min {results[name]['min'] * 1000:10.2f} ms")
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "size": size,
+        "benchmarks": results,
+    }
+
+
+def save_results(results: Dict, output_dir: str = "./results/benchmarks") -> str:
+    """Write the results to a timestamped JSON file and return its path."""
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    filepath = os.path.join(output_dir, f"benchmark_{timestamp}.json")
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {filepath}")
+    return filepath
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float = 0.2) -> List[str]:
+    """
+    Compare median timings against a baseline run.
+
+    Args:
+        results (Dict): Output of `run_benchmarks`.
+        baseline (Dict): A previously saved `run_benchmarks` output.
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: One message per regressed benchmark; empty if none regressed.
+    """
+    if baseline.get("size") != results.get("size"):
+        print(f"Warning: baseline size {baseline.get('size')} differs from current size {results.get('size')}.")
+
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if "skipped" in current:
+            print(f"{name}: not run, skipped")
+            continue
+        if previous is None or "skipped" in previous:
+            print(f"{name}: no baseline, skipped")
+            continue
+        ratio = current["median"] / previous["median"] if previous["median"] else float("inf")
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"{name:<60} {ratio:6.2f}x baseline  {status}")
+        if status == "REGRESSION":
+            regressions.append(
+                f"{name}: {current['median'] * 1000:.2f} ms vs baseline {previous['median'] * 1000:.2f} ms "
+                f"({ratio:.2f}x, threshold {1 + threshold:.2f}x)"
+            )
+    return regressions
@@ -0,0 +1,44 @@
+import hashlib
+import os
+
+# tiktoken encoding files bundled with the repo so the suite never touches the network
+BUNDLED_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tiktoken_cache")
+
+# Encodings needed by the benchmarks (gpt-4o-mini uses o200k_base)
+ENCODING_URLS = {
+    "o200k_base": "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken",
+}
+
+
+class MissingEncodingError(RuntimeError):
+    """A tiktoken encoding is not in the cache and would have to be downloaded."""
+
+
+def use_bundled_cache():
+    """Point tiktoken at the bundled cache unless TIKTOKEN_CACHE_DIR is already set."""
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", BUNDLED_CACHE_DIR)
+
+
+def cached_encoding_path(encoding_name: str) -> str:
+    # tiktoken names cache entries by the SHA-1 of the source URL
+    cache_key = hashlib.sha1(ENCODING_URLS[encoding_name].encode()).hexdigest()
+    return os.path.join(os.environ.get("TIKTOKEN_CACHE_DIR", BUNDLED_CACHE_DIR), cache_key)
+
+
+def require_encoding(encoding_name: str = "o200k_base"):
+    """Fail before tiktoken would fall back to downloading the encoding."""
+    if not os.path.exists(cached_encoding_path(encoding_name)):
+        raise MissingEncodingError(
+            f"The {encoding_name} encoding is missing from {os.path.dirname(cached_encoding_path(encoding_name))}. "
+            "Run `python -m src.benchmark --prepare-tiktoken-cache` once with network access and commit the file."
+        )
+
+
+def prepare_cache():
+    """Download the needed encodings into the cache; tiktoken verifies their SHA-256 on download."""
+    import tiktoken
+
+    os.makedirs(os.environ.get("TIKTOKEN_CACHE_DIR", BUNDLED_CACHE_DIR), exist_ok=True)
+    for encoding_name in ENCODING_URLS:
+        tiktoken.get_encoding(encoding_name)
+        print(f"Cached {encoding_name} at {cached_encoding_path(encoding_name)}")
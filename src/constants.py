@@ -0,0 +1,15 @@
+# Chat format overhead used when counting tokens for gpt-4o family models
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+REPLY_PRIMER_TOKENS = 3  # every reply is primed with <|start|>assistant<|message|>
+
+# Maximum tokens per training example when fine-tuning gpt-4o-mini; longer examples are truncated
+FINE_TUNING_CONTEXT_LIMIT = 65_536
+
+# USD per 1M tokens
+PRICING_PER_MILLION_TOKENS = {
+    "gpt-4o-mini": {"training": 3.00, "input": 0.15, "output": 0.60},
+    "ft:gpt-4o-mini": {"training": 3.00, "input": 0.30, "output": 1.20},
+    "gpt-4o-2024-08-06": {"training": 25.00, "input": 2.50, "output": 10.00},
+    "ft:gpt-4o-2024-08-06": {"training": 25.00, "input": 3.75, "output": 15.00},
+}
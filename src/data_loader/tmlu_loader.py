@@ -1,5 +1,9 @@
 from src.data_loader.base_loader import DataLoader
 from datasets import DatasetDict, load_dataset, get_dataset_config_names
+from src.llm.prompt.base_templates import (
+    TMLU_USER_PROMPT_TEMPLATE_PART_ONE,
+    TMLU_USER_PROMPT_TEMPLATE_PART_TWO
+)
 
 class TMLUDataLoader(DataLoader):
     def preprocess_dataset(self):
@@ -55,17 +59,6 @@ class TMLUDataLoader(DataLoader):
         return get_dataset_config_names(self.dataset_name)
     
     def create_user_prompt(self, example):
-        # Template for the question
-        prompt_template_part_one = '''
-        以下選擇題為出自臺灣的考題，答案為其中一個選項。
-
-        問題:
-        {question}
-
-        '''
-        prompt_template_part_two = '''
-        正確答案：(
-        '''
         # List of possible options (A to F)
         options = ["A", "B", "C", "D", "E", "F"]
         
@@ -73,7 +66,7 @@ class TMLUDataLoader(DataLoader):
         answer_template = ' '.join([f"({option}) {example[option]}" for option in options if example.get(option)])
         
         # Fill the question in the prompt template
-        prompt = prompt_template_part_one.format(question=example["question"]) + answer_template + prompt_template_part_two
+        prompt = TMLU_USER_PROMPT_TEMPLATE_PART_ONE.format(question=example["question"]) + answer_template + TMLU_USER_PROMPT_TEMPLATE_PART_TWO
         
         # Add the final prompt to 'user_content'
         example['user_content'] = prompt
@@ -0,0 +1,300 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import pyarrow as pa
+import tiktoken
+from datasets import Dataset
+
+from src.constants import TOKENS_PER_MESSAGE, TOKENS_PER_NAME, REPLY_PRIMER_TOKENS
+from src.data_processor.message_handler import format_example_as_messages
+from src.llm.prompt.base_templates import (
+    TEXT_PROMPT_TEMPLATE_ZH_V1,
+    TMLU_USER_PROMPT_TEMPLATE_PART_ONE,
+    TMLU_USER_PROMPT_TEMPLATE_PART_TWO
+)
+
+# Bump when the layout of the compiled table changes
+COMPILED_STORE_VERSION = 4
+
+# o200k_base is the encoding used by gpt-4o and gpt-4o-mini
+DEFAULT_ENCODINGS = ("o200k_base",)
+
+
+class CompiledPromptStore:
+    """
+    Persisted, memory-mapped store of rendered prompts and their token IDs.
+
+    The store lives next to `DataLoader.export_file_dir` as an Arrow IPC file plus a JSON
+    manifest. Each row holds the rendered messages (as JSON), a content hash, and for every
+    tiktoken encoding:
+
+    - `tokens_<encoding>`: list<list<int32>>, the token IDs of each message's 'content' only,
+      one inner list per message (no role tokens or chat separators).
+    - `num_tokens_<encoding>`: int32, the full chat-formatted prompt length, matching
+      `num_tokens_from_messages` (roles, names and per-message overhead included).
+    - `num_prompt_tokens_<encoding>`: int32, the same count over the messages before the last
+      assistant reply, i.e. what the model is sent when the row is evaluated. Equal to
+      `num_tokens_<encoding>` for rows without an assistant message.
+
+    Rows that `num_tokens_from_messages` cannot count (a non-string value, or text containing a
+    special token such as '<|endoftext|>') have null token columns, so they are skipped exactly
+    as the uncompiled path skips them.
+
+    The manifest records a fingerprint of the source dataset, prompt templates, rendered sample
+    rows, encodings and tiktoken version; the store is rebuilt whenever any of them changes.
+    """
+
+    def __init__(self, export_file_dir: str, name: str, encodings: Sequence[str] = DEFAULT_ENCODINGS):
+        self.compiled_dir = f"{export_file_dir.rstrip(os.sep)}_compiled"
+        self.name = name
+        self.encodings = tuple(encodings)
+        self.table_path = os.path.join(self.compiled_dir, f"{name}.arrow")
+        self.manifest_path = os.path.join(self.compiled_dir, f"{name}.json")
+
+    def fingerprint(self, source_fingerprint: str, templates: Iterable[str], rendered_samples: Iterable[List[Dict]] = ()) -> str:
+        """
+        Hash everything a compiled row depends on.
+
+        `rendered_samples` are a few rows passed through the render function, so a change to the
+        rendering logic itself (not only to the template strings) also invalidates the store.
+        """
+        payload = {
+            "version": COMPILED_STORE_VERSION,
+            "source": source_fingerprint,
+            "templates": list(templates),
+            "rendered_samples": list(rendered_samples),
+            "encodings": list(self.encodings),
+            "tiktoken": getattr(tiktoken, "__version__", ""),
+        }
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def is_valid(self, fingerprint: str) -> bool:
+        if not (os.path.exists(self.table_path) and os.path.exists(self.manifest_path)):
+            return False
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest.get("fingerprint") == fingerprint
+
+    def load(self) -> pa.Table:
+        """Memory-map the compiled table; columns are read lazily from the page cache."""
+        source = pa.memory_map(self.table_path, "r")
+        return pa.ipc.open_file(source).read_all()
+
+    def build(
+        self,
+        messages_list: List[List[Dict[str, str]]],
+        input_ids: List[str],
+        fingerprint: str,
+        groups: Optional[List[str]] = None,
+    ) -> pa.Table:
+        """
+        Tokenize the rendered messages and write the compiled table to disk.
+
+        Args:
+            messages_list (List[List[Dict[str, str]]]): Rendered messages, one list per example.
+            input_ids (List[str]): Identifier of each example.
+            fingerprint (str): Value returned by `fingerprint`, stored in the manifest.
+            groups (List[str]): Optional grouping label per example (e.g. TMLU 'subject').
+
+        Returns:
+            pa.Table: The memory-mapped compiled table.
+        """
+        messages_json = [json.dumps(messages, ensure_ascii=False) for messages in messages_list]
+        columns = {
+            "input_id": pa.array(input_ids, type=pa.string()),
+            "messages": pa.array(messages_json, type=pa.string()),
+            "content_hash": pa.array(
+                [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in messages_json], type=pa.string()
+            ),
+        }
+        if groups is not None:
+            columns["group"] = pa.array(groups, type=pa.string())
+
+        # Flatten every string value so each encoding runs a single batched (multi-threaded) pass.
+        # Per message, remember where its content landed; other values only add to the count.
+        # The prompt ends where the last assistant reply starts.
+        texts = []
+        offsets = [0]
+        content_positions = []
+        overheads = []
+        prompt_ends = []
+        prompt_overheads = []
+        has_non_string = []
+        for messages in messages_list:
+            overhead = REPLY_PRIMER_TOKENS
+            positions = []
+            non_string = False
+            prompt_end, prompt_overhead = None, None
+            for message in messages:
+                if message.get("role") == "assistant":
+                    prompt_end, prompt_overhead = len(texts), overhead
+                overhead += TOKENS_PER_MESSAGE
+                position = None
+                for key, value in message.items():
+                    if isinstance(value, str):
+                        if key == "content":
+                            position = len(texts)
+                        texts.append(value)
+                    else:
+                        non_string = True
+                    if key == "name":
+                        overhead += TOKENS_PER_NAME
+                positions.append(position)
+            offsets.append(len(texts))
+            content_positions.append(positions)
+            overheads.append(overhead)
+            prompt_ends.append(len(texts) if prompt_end is None else prompt_end)
+            prompt_overheads.append(overhead if prompt_overhead is None else prompt_overhead)
+            has_non_string.append(non_string)
+
+        for encoding_name in self.encodings:
+            encoding = tiktoken.get_encoding(encoding_name)
+            # `encode` raises on special-token text by default; encode the batch without that check
+            # and null out the affected rows instead, so one such row does not fail the whole build
+            special_tokens = encoding.special_tokens_set
+            has_special = [any(token in text for token in special_tokens) for text in texts]
+            encoded = encoding.encode_batch(texts, disallowed_special=())
+            token_ids = []
+            num_tokens = []
+            num_prompt_tokens = []
+            for row, overhead in enumerate(overheads):
+                start, end = offsets[row], offsets[row + 1]
+                if has_non_string[row] or any(has_special[start:end]):
+                    token_ids.append(None)
+                    num_tokens.append(None)
+                    num_prompt_tokens.append(None)
+                    continue
+                token_ids.append([encoded[position] if position is not None else [] for position in content_positions[row]])
+                num_tokens.append(sum(len(tokens) for tokens in encoded[start:end]) + overhead)
+                num_prompt_tokens.append(
+                    sum(len(tokens) for tokens in encoded[start:prompt_ends[row]]) + prompt_overheads[row]
+                )
+            columns[f"tokens_{encoding_name}"] = pa.array(token_ids, type=pa.list_(pa.list_(pa.int32())))
+            columns[f"num_tokens_{encoding_name}"] = pa.array(num_tokens, type=pa.int32())
+            columns[f"num_prompt_tokens_{encoding_name}"] = pa.array(num_prompt_tokens, type=pa.int32())
+
+        table = pa.table(columns)
+
+        os.makedirs(self.compiled_dir, exist_ok=True)
+        # Drop the old manifest first and swap the table in atomically, so an interrupted rebuild
+        # never leaves a partial table next to a manifest that vouches for it
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        tmp_path = f"{self.table_path}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, self.table_path)
+
+        # The manifest is written last so an interrupted build is never considered valid
+        manifest = {
+            "fingerprint": fingerprint,
+            "num_rows": table.num_rows,
+            "encodings": list(self.encodings),
+            "created_at": datetime.now().isoformat(),
+        }
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        print(f"Compiled {table.num_rows} examples to {self.table_path}.")
+
+        return self.load()
+
+    def load_or_build(
+        self,
+        dataset: Dataset,
+        render: Callable[[Dict], List[Dict[str, str]]],
+        templates: Iterable[str],
+        input_ids: Optional[List[str]] = None,
+        group_column: Optional[str] = None,
+    ) -> pa.Table:
+        """
+        Return the compiled table, rebuilding it only if the dataset, templates or tokenizer changed.
+
+        Args:
+            dataset (Dataset): Source dataset (a single split).
+            render (Callable): Turns one row into its list of messages.
+            templates (Iterable[str]): Every template string `render` depends on.
+            input_ids (List[str]): Identifier of each example; defaults to the row index.
+            group_column (str): Optional column copied into the 'group' column.
+        """
+        source_fingerprint = getattr(dataset, "_fingerprint", None)
+        if source_fingerprint is None:
+            raise ValueError("The dataset has no fingerprint; load it with `DataLoader.load_dataset` first.")
+
+        sample_indices = sorted({0, len(dataset) - 1}) if len(dataset) else []
+        rendered_samples = [render(dataset[idx]) for idx in sample_indices]
+        fingerprint = self.fingerprint(source_fingerprint, templates, rendered_samples)
+        if self.is_valid(fingerprint):
+            print(f"Compiled dataset already exists at {self.table_path}. Memory-mapping from disk...")
+            return self.load()
+
+        messages_list = [render(example) for example in dataset]
+        if input_ids is None:
+            input_ids = [str(idx) for idx in range(len(messages_list))]
+        groups = dataset[group_column] if group_column else None
+        return self.build(messages_list, input_ids, fingerprint, groups=groups)
+
+
+def load_messages(table: pa.Table) -> List[List[Dict[str, str]]]:
+    """Decode the rendered messages of a compiled table."""
+    return [json.loads(messages) for messages in table.column("messages").to_pylist()]
+
+
+def compile_tmlu_dataset(
+    loader,
+    dataset_dict,
+    split: str = "test",
+    encodings: Sequence[str] = DEFAULT_ENCODINGS,
+    store: Optional[CompiledPromptStore] = None,
+) -> pa.Table:
+    """
+    Compile a TMLU split, re-rendering 'user_content' from the current prompt template.
+
+    Args:
+        loader (TMLUDataLoader): The loader that produced `dataset_dict`.
+        dataset_dict (DatasetDict): The loaded TMLU dataset.
+        split (str): Split to compile.
+        encodings (Sequence[str]): tiktoken encodings to store.
+        store (CompiledPromptStore): Store to use; defaults to `split` next to the loader's export dir.
+    """
+    store = store or CompiledPromptStore(loader.export_file_dir, split, encodings)
+    return store.load_or_build(
+        dataset_dict[split],
+        render=lambda example: format_example_as_messages(loader.create_user_prompt(dict(example))),
+        templates=(TEXT_PROMPT_TEMPLATE_ZH_V1, TMLU_USER_PROMPT_TEMPLATE_PART_ONE, TMLU_USER_PROMPT_TEMPLATE_PART_TWO),
+        group_column="subject",
+    )
+
+
+def compile_fine_tune_dataset(
+    loader,
+    dataset: Dataset,
+    name: str = "train",
+    encodings: Sequence[str] = DEFAULT_ENCODINGS,
+    store: Optional[CompiledPromptStore] = None,
+) -> pa.Table:
+    """
+    Compile a TaiwanChat dataset into system prompt + conversation messages.
+
+    Args:
+        loader (TaiwanChatDataLoader): The loader that produced `dataset`.
+        dataset (Dataset): The (optionally filtered) TaiwanChat dataset.
+        name (str): Name of the compiled file, e.g. the subset name.
+        encodings (Sequence[str]): tiktoken encodings to store.
+        store (CompiledPromptStore): Store to use; defaults to `name` next to the loader's export dir.
+    """
+    system_message = {
+        "role": "system",
+        "content": TEXT_PROMPT_TEMPLATE_ZH_V1
+    }
+    store = store or CompiledPromptStore(loader.export_file_dir, name, encodings)
+    return store.load_or_build(
+        dataset,
+        render=lambda example: [system_message] + example["messages"],
+        templates=(TEXT_PROMPT_TEMPLATE_ZH_V1,),
+        input_ids=dataset["instance_id"],
+        group_column="dataset_name",
+    )
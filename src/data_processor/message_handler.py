@@ -2,6 +2,7 @@ import tiktoken
 from collections import defaultdict
 from typing import List, Dict
 from datasets import DatasetDict, Dataset
+from src.constants import TOKENS_PER_MESSAGE, TOKENS_PER_NAME, REPLY_PRIMER_TOKENS
 from src.llm.prompt.base_templates import TEXT_PROMPT_TEMPLATE_ZH_V1
 
 def format_fine_tune_dataset_as_messages(dataset: Dataset) -> List[List[Dict[str, str]]]:
@@ -87,25 +88,43 @@ def format_dataset_as_messages(dataset_dict: DatasetDict) -> List[List[Dict[str,
     messages_list = []
     
     for example in test_dataset:
-        # Create the user role message using 'user_content' from the dataset
-        user_message = {
-            "role": "user",
-            "content": example["user_content"]
-        }
-        
-        # Combine the system message and user message into a list
-        messages = [system_message, user_message]
-        
         # Add the list of messages to the final list
-        messages_list.append(messages)
+        messages_list.append(format_example_as_messages(example, system_message))
     
     return messages_list
 
+def format_example_as_messages(example: Dict, system_message: Dict[str, str] = None) -> List[Dict[str, str]]:
+    """
+    Formats a single evaluation example into a list of messages.
+    
+    Args:
+        example (Dict): A row containing 'user_content'.
+        system_message (Dict[str, str]): The system role message; defaults to TEXT_PROMPT_TEMPLATE_ZH_V1.
+    
+    Returns:
+        List[Dict[str, str]]: The system message followed by the user message.
+    """
+    if system_message is None:
+        system_message = {
+            "role": "system",
+            "content": TEXT_PROMPT_TEMPLATE_ZH_V1
+        }
+
+    # Create the user role message using 'user_content' from the dataset
+    user_message = {
+        "role": "user",
+        "content": example["user_content"]
+    }
+
+    # Combine the system message and user message into a list
+    return [system_message, user_message]
+
 def format_fine_tune_dataset_as_openai_input_with_threshold(
         dataset: Dataset, 
         M_token_threshold: int,
         model: str = "gpt-4o-mini",
-        prompt_template: str = "Your default prompt template here"
+        prompt_template: str = "Your default prompt template here",
+        compiled_table=None
     ) -> List[Dict[str, List[Dict[str, str]]]]:
     """
     Formats each row in the dataset into a list of messages and returns only 
@@ -116,6 +135,9 @@ def format_fine_tune_dataset_as_openai_input_with_threshold(
         M_token_threshold (int): Maximum number of tokens (M) for the dataset.
         model (str): Model name to use for token calculation.
         prompt_template (str): The system prompt template to be added in each message list.
+        compiled_table (pa.Table): Optional table from `compile_fine_tune_dataset`. When given,
+            its rendered messages and stored token counts are used instead of formatting and
+            tokenizing `dataset`, and `dataset` and `prompt_template` are ignored.
 
     Returns:
         List[Dict[str, List[Dict[str, str]]]]: A list of message dictionaries 
@@ -123,36 +145,24 @@ def format_fine_tune_dataset_as_openai_input_with_threshold(
         containing the list of message dicts.
     """
     
-    # Define the fixed system role message
-    system_message = {
-        "role": "system",
-        "content": prompt_template
-    }
-    
     # Initialize variables
     messages_list = []
     threshold = M_token_threshold * 1_000_000
     total_tokens = 0
 
-    for example in dataset:
-        # Ensure that 'messages' is a list of dictionaries in the example
-        if 'messages' not in example or not isinstance(example['messages'], list):
-            continue
-
-        # Combine the system message and user messages into a list
-        messages = [system_message] + example['messages']
-        
+    for messages, example_tokens in _iter_fine_tune_messages(dataset, model, prompt_template, compiled_table):
         # Check if the message list is valid according to OpenAI format requirements
         if not is_valid_openai_example({"messages": messages}):
             continue
 
-        # Calculate the number of tokens for this example
-        try:
-            example_tokens = num_tokens_from_messages(messages, model=model)
-        except Exception as e:
-            # Log the error message if token calculation fails and continue with the next example
-            print(f"Error calculating tokens for example: {e}")
-            continue
+        # Calculate the number of tokens for this example unless it was precomputed
+        if example_tokens is None:
+            try:
+                example_tokens = num_tokens_from_messages(messages, model=model)
+            except Exception as e:
+                # Log the error message if token calculation fails and continue with the next example
+                print(f"Error calculating tokens for example: {e}")
+                continue
 
         # Check if adding this example would exceed the token threshold
         if total_tokens + example_tokens > threshold:
@@ -168,6 +178,30 @@ def format_fine_tune_dataset_as_openai_input_with_threshold(
     
     return messages_list
 
+def _iter_fine_tune_messages(dataset, model, prompt_template, compiled_table):
+    """Yield (messages, token count or None) from a compiled table or by formatting the dataset."""
+    if compiled_table is not None:
+        from src.data_processor.compiled_store import load_messages
+
+        encoding_name = tiktoken.encoding_for_model(model).name
+        num_tokens = compiled_table.column(f"num_tokens_{encoding_name}").to_pylist()
+        yield from zip(load_messages(compiled_table), num_tokens)
+        return
+
+    # Define the fixed system role message
+    system_message = {
+        "role": "system",
+        "content": prompt_template
+    }
+
+    for example in dataset:
+        # Ensure that 'messages' is a list of dictionaries in the example
+        if 'messages' not in example or not isinstance(example['messages'], list):
+            continue
+
+        # Combine the system message and user messages into a list
+        yield [system_message] + example['messages'], None
+
 def num_tokens_from_messages(messages: List[Dict[str, str]], model: str = "gpt-4o-mini") -> int:
     """Return the number of tokens used by a list of messages."""
     try:
@@ -180,8 +214,8 @@ def num_tokens_from_messages(messages: List[Dict[str, str]], model: str = "gpt-4
         "gpt-4o-mini",
         "gpt-4o-mini-2024-07-18"
         }:
-        tokens_per_message = 3
-        tokens_per_name = 1
+        tokens_per_message = TOKENS_PER_MESSAGE
+        tokens_per_name = TOKENS_PER_NAME
     else:
         raise NotImplementedError(
             f"""num_tokens_from_messages() is not implemented for model {model}."""
@@ -193,7 +227,7 @@ def num_tokens_from_messages(messages: List[Dict[str, str]], model: str = "gpt-4
             num_tokens += len(encoding.encode(value))
             if key == "name":
                 num_tokens += tokens_per_name
-    num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
+    num_tokens += REPLY_PRIMER_TOKENS  # every reply is primed with <|start|>assistant<|message|>
     return num_tokens
 
 def is_valid_openai_example(example: Dict) -> bool:
@@ -0,0 +1,206 @@
+import json
+import os
+import re
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+
+from src.constants import FINE_TUNING_CONTEXT_LIMIT, PRICING_PER_MILLION_TOKENS
+from src.data_processor.compiled_store import (
+    DEFAULT_ENCODINGS,
+    CompiledPromptStore,
+    compile_fine_tune_dataset,
+    compile_tmlu_dataset,
+)
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Snapshot date at the end of a model name, e.g. 'gpt-4o-mini-2024-07-18'
+_SNAPSHOT_SUFFIX = re.compile(r"-\d{4}-\d{2}-\d{2}$")
+
+
+def _summarize(lengths: np.ndarray, prompt_lengths: np.ndarray, bin_edges: np.ndarray, context_limit: int) -> Dict:
+    if lengths.size == 0:
+        return {"count": 0, "total_tokens": 0, "prompt_tokens": 0, "billable_tokens": 0, "num_over_context_limit": 0}
+
+    counts, _ = np.histogram(lengths, bins=bin_edges)
+    summary = {
+        "count": int(lengths.size),
+        "total_tokens": int(lengths.sum()),
+        # Tokens sent when evaluating, i.e. without the final assistant replies
+        "prompt_tokens": int(prompt_lengths.sum()),
+        # Examples over the context limit are truncated, so only the first `context_limit` tokens are billed
+        "billable_tokens": int(np.minimum(lengths, context_limit).sum()),
+        "num_over_context_limit": int((lengths > context_limit).sum()),
+        "mean": float(lengths.mean()),
+        "min": int(lengths.min()),
+        "max": int(lengths.max()),
+        "histogram": {"bin_edges": bin_edges.tolist(), "counts": counts.tolist()},
+    }
+    for percentile, value in zip(PERCENTILES, np.percentile(lengths, PERCENTILES)):
+        summary[f"p{percentile}"] = float(value)
+    return summary
+
+
+def compute_token_stats(
+    table: pa.Table,
+    encoding: str = DEFAULT_ENCODINGS[0],
+    context_limit: int = FINE_TUNING_CONTEXT_LIMIT,
+    bins: int = 20,
+) -> Dict:
+    """
+    Compute token-length statistics from a compiled table in one vectorized pass.
+
+    Args:
+        table (pa.Table): A table produced by `CompiledPromptStore`.
+        encoding (str): Which stored encoding's token counts to use.
+        context_limit (int): Examples above this length are counted as over the limit.
+        bins (int): Number of histogram bins, shared by every group.
+
+    Returns:
+        Dict: 'overall' statistics and, if the table has a 'group' column, 'groups' keyed by group.
+        Rows without a token count (see `CompiledPromptStore`) are left out and counted in
+        'num_untokenizable'.
+    """
+    column = table.column(f"num_tokens_{encoding}")
+    valid = column.is_valid().to_numpy(zero_copy_only=False)
+    lengths = column.fill_null(0).to_numpy()[valid]
+    prompt_lengths = table.column(f"num_prompt_tokens_{encoding}").fill_null(0).to_numpy()[valid]
+    bin_edges = np.histogram_bin_edges(lengths, bins=bins) if lengths.size else np.array([0.0, 1.0])
+
+    stats = {
+        "encoding": encoding,
+        "context_limit": context_limit,
+        "num_untokenizable": int(column.null_count),
+        "overall": _summarize(lengths, prompt_lengths, bin_edges, context_limit),
+        "groups": {},
+    }
+
+    if "group" in table.column_names:
+        encoded = table.column("group").combine_chunks().dictionary_encode()
+        codes = encoded.indices.to_numpy(zero_copy_only=False)[valid]
+        for code, group in enumerate(encoded.dictionary.to_pylist()):
+            mask = codes == code
+            stats["groups"][group] = _summarize(lengths[mask], prompt_lengths[mask], bin_edges, context_limit)
+
+    return stats
+
+
+def _pricing_for_model(model: str) -> Dict[str, float]:
+    """
+    Look up a model in PRICING_PER_MILLION_TOKENS, accepting snapshot and fine-tuned model IDs.
+
+    'gpt-4o-mini-2024-07-18' falls back to 'gpt-4o-mini', and a fine-tuned model ID such as
+    'ft:gpt-4o-mini-2024-07-18:org::abc123' is priced as 'ft:gpt-4o-mini'.
+    """
+    if model.startswith("ft:"):
+        candidates = ["ft:" + model.split(":")[1]]
+    else:
+        candidates = [model]
+    candidates.append(_SNAPSHOT_SUFFIX.sub("", candidates[0]))
+
+    for candidate in candidates:
+        if candidate in PRICING_PER_MILLION_TOKENS:
+            return PRICING_PER_MILLION_TOKENS[candidate]
+    raise ValueError(f"No pricing for model {model}. Known models: {list(PRICING_PER_MILLION_TOKENS)}")
+
+
+def estimate_cost(
+    stats: Dict,
+    epochs: int = 3,
+    model: str = "gpt-4o-mini",
+    pricing: Optional[Dict[str, float]] = None,
+    output_tokens_per_example: int = 1,
+) -> Dict:
+    """
+    Project training and evaluation cost from token statistics.
+
+    Args:
+        stats (Dict): Output of `compute_token_stats`.
+        epochs (int): Number of training epochs; training is billed per token per epoch.
+        model (str): Model name, with or without a snapshot date; ignored if `pricing` is given.
+            A fine-tuned model ID is priced by its base model.
+        pricing (Dict[str, float]): USD per 1M tokens with 'training', 'input' and 'output' keys.
+        output_tokens_per_example (int): Expected completion length when evaluating.
+
+    Evaluation input is priced on 'prompt_tokens', which leaves out the final assistant reply of
+    fine-tuning conversations; training is priced on the full conversation.
+
+    Returns:
+        Dict: Cost breakdown for 'overall' and for each group, in USD.
+    """
+    pricing = pricing or _pricing_for_model(model)
+
+    def cost(summary: Dict) -> Dict:
+        training_tokens = summary["billable_tokens"] * epochs
+        eval_output_tokens = summary["count"] * output_tokens_per_example
+        return {
+            "training_tokens": training_tokens,
+            "training_cost": training_tokens * pricing["training"] / 1_000_000,
+            "eval_input_cost": summary["prompt_tokens"] * pricing["input"] / 1_000_000,
+            "eval_output_cost": eval_output_tokens * pricing["output"] / 1_000_000,
+        }
+
+    return {
+        "epochs": epochs,
+        "pricing": pricing,
+        "overall": cost(stats["overall"]),
+        "groups": {group: cost(summary) for group, summary in stats["groups"].items()},
+    }
+
+
+def load_or_compute_token_stats(
+    store: CompiledPromptStore,
+    table: pa.Table,
+    encoding: str = DEFAULT_ENCODINGS[0],
+    context_limit: int = FINE_TUNING_CONTEXT_LIMIT,
+    bins: int = 20,
+) -> Dict:
+    """
+    Return token statistics cached next to the compiled store, recomputing them only when
+    the compiled dataset fingerprint or the statistics parameters change.
+    """
+    with open(store.manifest_path, "r", encoding="utf-8") as f:
+        fingerprint = json.load(f)["fingerprint"]
+    params = {"encoding": encoding, "context_limit": context_limit, "bins": bins}
+    cache_path = os.path.join(store.compiled_dir, f"{store.name}_token_stats.json")
+
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("fingerprint") == fingerprint and cached.get("params") == params:
+            return cached["stats"]
+
+    stats = compute_token_stats(table, encoding, context_limit, bins)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "params": params, "stats": stats}, f, ensure_ascii=False)
+    return stats
+
+
+def tmlu_token_stats(
+    loader,
+    dataset_dict,
+    split: str = "test",
+    encodings: Sequence[str] = DEFAULT_ENCODINGS,
+    context_limit: int = FINE_TUNING_CONTEXT_LIMIT,
+    bins: int = 20,
+) -> Dict:
+    """Token statistics of a TMLU split, broken down by 'subject'."""
+    store = CompiledPromptStore(loader.export_file_dir, split, encodings)
+    table = compile_tmlu_dataset(loader, dataset_dict, split, encodings, store=store)
+    return load_or_compute_token_stats(store, table, encodings[0], context_limit, bins)
+
+
+def fine_tune_token_stats(
+    loader,
+    dataset,
+    name: str = "train",
+    encodings: Sequence[str] = DEFAULT_ENCODINGS,
+    context_limit: int = FINE_TUNING_CONTEXT_LIMIT,
+    bins: int = 20,
+) -> Dict:
+    """Token statistics of a TaiwanChat dataset, broken down by 'dataset_name'."""
+    store = CompiledPromptStore(loader.export_file_dir, name, encodings)
+    table = compile_fine_tune_dataset(loader, dataset, name, encodings, store=store)
+    return load_or_compute_token_stats(store, table, encodings[0], context_limit, bins)
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+from datasets import DatasetDict
+from openlimit import ChatRateLimiter
+from sqlalchemy.orm import Session
+
+from src.backend.crud import (
+    add_evaluation_experiment,
+    add_evaluation_metrics,
+    add_llm_responses,
+)
+from src.data_processor.compiled_store import load_messages
+from src.data_processor.message_handler import format_dataset_as_messages
+from src.evaluator.scoring import compute_accuracy, get_response_content, score_response
+from src.llm.chain.llm_text_chain import REQUEST_LIMIT, TOKEN_LIMIT, call_openai
+
+
+class FanOutEvaluator:
+    """
+    Evaluate several models on the TMLU test split concurrently.
+
+    Prompts are formatted once and shared by every model. OpenAI rate limits apply per model,
+    so each model gets its own rate limiter as well as its own concurrency budget; models never
+    queue behind each other and the whole leaderboard finishes in roughly the time of the
+    slowest model.
+    """
+
+    def __init__(
+        self,
+        dataset_dict: DatasetDict,
+        models: List[str],
+        db: Optional[Session] = None,
+        concurrency_per_model: int = 32,
+        request_limit: int = REQUEST_LIMIT,
+        token_limit: int = TOKEN_LIMIT,
+        prompt_name: str = 'TEXT_PROMPT_TEMPLATE_ZH_V1',
+        data_name: str = 'miulab/tmlu',
+        compiled_table: Optional[pa.Table] = None,
+    ):
+        """
+        Args:
+            compiled_table (pa.Table): Optional table from `compile_tmlu_dataset` for the test split;
+                its rendered messages are used instead of formatting the dataset again.
+        """
+        if len(set(models)) != len(models):
+            raise ValueError("Each model may only appear once in a fan-out evaluation.")
+
+        self.models = models
+        self.db = db
+        self.concurrency_per_model = concurrency_per_model
+        self.rate_limiters = {
+            model: ChatRateLimiter(request_limit=request_limit, token_limit=token_limit)
+            for model in models
+        }
+        self.prompt_name = prompt_name
+        self.data_name = data_name
+
+        # Shared prompt preparation: formatted (or read from the compiled store) once, reused by every model
+        if compiled_table is not None:
+            if compiled_table.num_rows != len(dataset_dict['test']):
+                raise ValueError("The compiled table does not match the test split; recompile it.")
+            self.messages_list = load_messages(compiled_table)
+        else:
+            self.messages_list = format_dataset_as_messages(dataset_dict)
+        # score_response only needs the answer column, which avoids materializing every row
+        self.examples = [{'answer': answer} for answer in dataset_dict['test']['answer']]
+
+    async def _ask(self, semaphore: asyncio.Semaphore, model: str, idx: int) -> Optional[str]:
+        async with semaphore:
+            try:
+                response = await call_openai(
+                    messages=self.messages_list[idx],
+                    openai_llm_endpoint=model,
+                    limiter=self.rate_limiters[model],
+                )
+            except Exception as e:
+                print(f"Error calling {model} for question {idx}: {e}")
+                return None
+        return get_response_content(response)
+
+    async def _evaluate_model(self, model: str) -> Dict[str, float]:
+        semaphore = asyncio.Semaphore(self.concurrency_per_model)
+        contents = await asyncio.gather(
+            *[self._ask(semaphore, model, idx) for idx in range(len(self.messages_list))]
+        )
+
+        responses = []
+        num_correct = 0
+        for idx, content in enumerate(contents):
+            if content is None:
+                continue
+            responses.append({'input_id': str(idx), 'model_response': content})
+            num_correct += int(score_response(self.examples[idx], content))
+
+        metrics = {
+            'accuracy': compute_accuracy(num_correct, len(responses)),
+            'num_samples': float(len(responses)),
+            'num_errors': float(len(self.messages_list) - len(responses)),
+        }
+
+        if self.db is not None:
+            experiment = add_evaluation_experiment(self.db, model, self.prompt_name, self.data_name)
+            add_llm_responses(self.db, experiment.id, responses)
+            add_evaluation_metrics(self.db, experiment.id, metrics)
+            metrics['experiment_id'] = str(experiment.id)
+
+        print(f"{model}: accuracy={metrics['accuracy']:.4f} ({int(metrics['num_errors'])} failed requests)")
+        return metrics
+
+    async def run(self) -> Dict[str, Dict[str, float]]:
+        """
+        Evaluate all models concurrently.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Metrics per model, ordered from highest to lowest accuracy.
+        """
+        results = await asyncio.gather(*[self._evaluate_model(model) for model in self.models])
+        leaderboard = sorted(zip(self.models, results), key=lambda item: item[1]['accuracy'], reverse=True)
+        return dict(leaderboard)
@@ -0,0 +1,307 @@
+import asyncio
+import math
+import random
+import uuid
+from collections import Counter, defaultdict
+from statistics import NormalDist
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+from datasets import Dataset, DatasetDict
+from sqlalchemy.orm import Session
+
+from src.backend.crud import (
+    add_evaluation_experiment,
+    add_evaluation_metrics,
+    add_llm_responses,
+    get_evaluation_metrics,
+)
+from src.data_processor.compiled_store import load_messages
+from src.data_processor.message_handler import format_example_as_messages
+from src.evaluator.scoring import compute_accuracy, get_response_content, score_response
+from src.llm.chain.llm_text_chain import call_openai
+
+
+class _Stratum:
+    """Sampling state of a single TMLU subject."""
+
+    def __init__(self, subject: str, indices: List[int]):
+        self.subject = subject
+        self.population = len(indices)
+        self.remaining = indices
+        self.num_sampled = 0
+        self.num_correct = 0
+        self.num_failed = 0
+
+    @property
+    def accuracy(self) -> float:
+        return compute_accuracy(self.num_correct, self.num_sampled)
+
+    @property
+    def smoothed_accuracy(self) -> float:
+        # Add-half smoothing keeps the variance positive when a subject is all right or all wrong
+        return (self.num_correct + 0.5) / (self.num_sampled + 1)
+
+    @property
+    def variance(self) -> float:
+        if not self.num_sampled:
+            return 0.25
+        p = self.smoothed_accuracy
+        finite_population_correction = 1 - self.num_sampled / self.population
+        return p * (1 - p) / self.num_sampled * finite_population_correction
+
+
+class QuickEvaluator:
+    """
+    Adaptive-sample evaluation on the TMLU test split.
+
+    Questions are drawn in rounds, stratified by 'subject', and the stratified accuracy
+    estimate is updated as each response arrives. Sampling stops at the end of the first round
+    where the confidence interval half-width (of the accuracy, or of the difference from a
+    baseline experiment) is within `target_precision`.
+
+    A failed request puts its question back in the subject's queue, up to `max_retries` times.
+    Subjects that end up with no answers at all are left out of the estimate (the remaining
+    subjects' weights are renormalized) and reported in 'uncovered_subjects'.
+    """
+
+    def __init__(
+        self,
+        dataset_dict: DatasetDict,
+        openai_llm_endpoint: str = 'gpt-4o-mini',
+        db: Optional[Session] = None,
+        baseline_experiment_id: Optional[str] = None,
+        target_precision: float = 0.02,
+        confidence: float = 0.95,
+        round_size: int = 200,
+        max_rounds: int = 50,
+        prompt_name: str = 'TEXT_PROMPT_TEMPLATE_ZH_V1',
+        data_name: str = 'miulab/tmlu',
+        split: str = 'test',
+        seed: int = 42,
+        compiled_table: Optional[pa.Table] = None,
+        max_retries: int = 2,
+    ):
+        """
+        Args:
+            compiled_table (pa.Table): Optional table from `compile_tmlu_dataset` for `split`;
+                its rendered messages are used instead of formatting each sampled question.
+            max_retries (int): How many times a question whose request failed is asked again.
+        """
+        if baseline_experiment_id is not None and db is None:
+            raise ValueError("A database session is required to compare against a baseline experiment.")
+
+        self.dataset: Dataset = dataset_dict[split]
+        self.openai_llm_endpoint = openai_llm_endpoint
+        self.db = db
+        self.target_precision = target_precision
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.round_size = round_size
+        self.max_rounds = max_rounds
+        self.prompt_name = prompt_name
+        self.data_name = data_name
+        self.rng = random.Random(seed)
+        self.max_retries = max_retries
+
+        self.messages_list = None
+        if compiled_table is not None:
+            if compiled_table.num_rows != len(self.dataset):
+                raise ValueError(f"The compiled table does not match the '{split}' split; recompile it.")
+            self.messages_list = load_messages(compiled_table)
+
+        self.baseline_accuracy = None
+        self.baseline_stderr = 0.0
+        if baseline_experiment_id is not None:
+            self.baseline_accuracy, self.baseline_stderr = self._load_baseline(baseline_experiment_id)
+
+        self.strata = self._build_strata()
+        self.total_population = sum(stratum.population for stratum in self.strata)
+        self.history: List[Dict] = []
+        self.num_errors = 0
+        self.failed_attempts = Counter()
+
+    def _build_strata(self) -> List[_Stratum]:
+        indices_by_subject = defaultdict(list)
+        for idx, subject in enumerate(self.dataset['subject']):
+            indices_by_subject[subject].append(idx)
+
+        strata = []
+        for subject in sorted(indices_by_subject):
+            indices = indices_by_subject[subject]
+            self.rng.shuffle(indices)
+            strata.append(_Stratum(subject, indices))
+        return strata
+
+    def _load_baseline(self, experiment_id: str):
+        metrics = get_evaluation_metrics(self.db, uuid.UUID(str(experiment_id)))
+        if 'accuracy' not in metrics:
+            raise ValueError(f"Baseline experiment {experiment_id} has no 'accuracy' metric.")
+        # A full run has no sampling error, so a missing stderr is treated as zero
+        return metrics['accuracy'], metrics.get('accuracy_stderr', 0.0)
+
+    def uncovered_subjects(self) -> List[str]:
+        """Subjects without a single answered question."""
+        return [stratum.subject for stratum in self.strata if stratum.num_sampled == 0]
+
+    def estimate(self) -> Dict[str, float]:
+        """
+        Compute the stratified accuracy estimate and its confidence interval.
+
+        Only subjects with at least one answer contribute; their population weights are
+        renormalized so an unanswered subject does not count as zero accuracy.
+
+        Returns:
+            Dict[str, float]: accuracy, stderr, CI bounds and, with a baseline, the difference from it.
+        """
+        covered = [stratum for stratum in self.strata if stratum.num_sampled]
+        covered_population = sum(stratum.population for stratum in covered)
+
+        accuracy = 0.0
+        variance = 0.0
+        for stratum in covered:
+            weight = stratum.population / covered_population
+            accuracy += weight * stratum.accuracy
+            variance += weight ** 2 * stratum.variance
+        # Nothing answered yet: report the widest possible interval
+        stderr = math.sqrt(variance) if covered else 0.5
+
+        result = {
+            'accuracy': accuracy,
+            'accuracy_stderr': stderr,
+            'accuracy_ci_low': max(0.0, accuracy - self.z * stderr),
+            'accuracy_ci_high': min(1.0, accuracy + self.z * stderr),
+            'num_samples': float(sum(stratum.num_sampled for stratum in self.strata)),
+            'num_uncovered_subjects': float(len(self.strata) - len(covered)),
+            'half_width': self.z * stderr,
+        }
+
+        if self.baseline_accuracy is not None:
+            diff_stderr = math.sqrt(stderr ** 2 + self.baseline_stderr ** 2)
+            result['accuracy_diff'] = accuracy - self.baseline_accuracy
+            result['accuracy_diff_stderr'] = diff_stderr
+            result['half_width'] = self.z * diff_stderr
+
+        return result
+
+    def is_precise_enough(self) -> bool:
+        # Every subject needs an answer before the estimate is meaningful, unless its requests
+        # keep failing; such a subject is reported as uncovered rather than holding up the run
+        if any(
+            stratum.num_sampled == 0 and stratum.remaining and stratum.num_failed <= self.max_retries
+            for stratum in self.strata
+        ):
+            return False
+        if len(self.uncovered_subjects()) == len(self.strata):
+            return False
+        return self.estimate()['half_width'] <= self.target_precision
+
+    def _allocate_round(self) -> List[int]:
+        """
+        Draw the next round of question indices using Neyman allocation over subjects.
+
+        Each subject with questions left gets at least one draw; the rest of the round is split
+        in proportion to population share times the current standard deviation estimate.
+        """
+        active = [stratum for stratum in self.strata if stratum.remaining]
+        if not active:
+            return []
+
+        weights = {}
+        for stratum in active:
+            p = stratum.smoothed_accuracy if stratum.num_sampled else 0.5
+            weights[stratum.subject] = stratum.population * math.sqrt(p * (1 - p))
+        total_weight = sum(weights.values())
+
+        selected = []
+        for stratum in active:
+            share = round(self.round_size * weights[stratum.subject] / total_weight)
+            take = min(max(1, share), len(stratum.remaining))
+            selected.extend((stratum, idx) for idx in stratum.remaining[:take])
+            stratum.remaining = stratum.remaining[take:]
+        return selected
+
+    async def _ask(self, stratum: _Stratum, idx: int):
+        example = self.dataset[idx]
+        try:
+            response = await call_openai(
+                messages=self.messages_list[idx] if self.messages_list is not None else format_example_as_messages(example),
+                openai_llm_endpoint=self.openai_llm_endpoint,
+            )
+        except Exception as e:
+            print(f"Error calling {self.openai_llm_endpoint} for question {idx}: {e}")
+            return stratum, idx, example, None
+        return stratum, idx, example, get_response_content(response)
+
+    async def _run_round(self, selected) -> List[Dict[str, str]]:
+        """
+        Ask every question of a round, updating the strata as each response arrives.
+
+        The round always runs to completion: stopping on whichever questions finish first would
+        bias the sample towards short prompts and answers, and cancelled requests are billed anyway.
+        """
+        tasks = [self._ask(stratum, idx) for stratum, idx in selected]
+        responses = []
+        for future in asyncio.as_completed(tasks):
+            stratum, idx, example, content = await future
+            if content is None:
+                self.num_errors += 1
+                stratum.num_failed += 1
+                self.failed_attempts[idx] += 1
+                # Retry in a later round so failures do not silently shrink a subject's sample
+                if self.failed_attempts[idx] <= self.max_retries:
+                    stratum.remaining.append(idx)
+                continue
+            stratum.num_sampled += 1
+            stratum.num_correct += int(score_response(example, content))
+            responses.append({'input_id': str(idx), 'model_response': content})
+        return responses
+
+    async def run(self) -> Dict:
+        """
+        Run rounds until the target precision, `max_rounds` or the end of the dataset is reached.
+
+        Returns:
+            Dict: The final estimate (see `estimate`), 'uncovered_subjects', plus 'experiment_id'
+            when a DB is used.
+        """
+        experiment = None
+        if self.db is not None:
+            experiment = add_evaluation_experiment(
+                self.db, self.openai_llm_endpoint, self.prompt_name, f"{self.data_name} (quick eval)"
+            )
+
+        for round_number in range(1, self.max_rounds + 1):
+            selected = self._allocate_round()
+            if not selected:
+                print("All questions have been sampled.")
+                break
+
+            responses = await self._run_round(selected)
+            if experiment is not None and responses:
+                add_llm_responses(self.db, experiment.id, responses)
+
+            estimate = self.estimate()
+            self.history.append(estimate)
+            print(
+                f"Round {round_number}: n={int(estimate['num_samples'])}, "
+                f"accuracy={estimate['accuracy']:.4f} "
+                f"[{estimate['accuracy_ci_low']:.4f}, {estimate['accuracy_ci_high']:.4f}]"
+                + (f", diff={estimate['accuracy_diff']:+.4f}" if 'accuracy_diff' in estimate else "")
+            )
+
+            if self.is_precise_enough():
+                print(f"Target precision {self.target_precision} reached after {round_number} round(s).")
+                break
+
+        result = self.estimate()
+        uncovered = self.uncovered_subjects()
+        if uncovered:
+            print(f"Warning: no answers for {len(uncovered)} subject(s), excluded from the estimate: {', '.join(uncovered)}")
+
+        if experiment is not None:
+            metrics = {name: value for name, value in result.items() if name != 'half_width'}
+            metrics['num_errors'] = float(self.num_errors)
+            add_evaluation_metrics(self.db, experiment.id, metrics)
+            result['experiment_id'] = str(experiment.id)
+        result['uncovered_subjects'] = uncovered
+        return result
@@ -0,0 +1,63 @@
+import re
+from typing import Dict, Optional
+
+# Options used by the TMLU multiple-choice questions
+ANSWER_OPTIONS = ["A", "B", "C", "D", "E", "F"]
+
+# The user prompt ends with '正確答案：(' so a well-behaved model replies with e.g. 'B) ...'
+_BRACKETED_CHOICE = re.compile(r"^\s*\(?\s*([A-F])\s*[\)）]")
+_STANDALONE_CHOICE = re.compile(r"(?<![A-Za-z])([A-F])(?![A-Za-z])")
+
+
+def extract_answer_choice(response_text: Optional[str]) -> Optional[str]:
+    """
+    Extract the chosen option letter from a model response.
+
+    Args:
+        response_text (str): Raw text returned by the LLM.
+
+    Returns:
+        Optional[str]: The option letter ('A' to 'F'), or None if no option was found.
+    """
+    if not response_text:
+        return None
+
+    match = _BRACKETED_CHOICE.search(response_text)
+    if match:
+        return match.group(1)
+
+    match = _STANDALONE_CHOICE.search(response_text)
+    if match:
+        return match.group(1)
+
+    return None
+
+
+def get_response_content(response) -> str:
+    """Return the message content of a chat completion returned by `call_openai`."""
+    return response.choices[0].message.content or ""
+
+
+def score_response(example: Dict, response_text: Optional[str]) -> bool:
+    """
+    Score a single TMLU example.
+
+    Args:
+        example (Dict): A TMLU row containing the 'answer' column.
+        response_text (str): Raw text returned by the LLM.
+
+    Returns:
+        bool: True if the extracted option matches the reference answer.
+    """
+    answer = str(example["answer"]).strip().strip("()")
+    return extract_answer_choice(response_text) == answer
+
+
+def compute_accuracy(num_correct: int, num_answered: int) -> float:
+    """
+    Accuracy over the questions that got a response.
+
+    Failed requests are excluded rather than counted as wrong; evaluators log them
+    separately as 'num_errors'.
+    """
+    return num_correct / num_answered if num_answered else 0.0
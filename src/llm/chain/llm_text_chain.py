@@ -7,17 +7,21 @@ from src.llm.prompt.base_templates import (
     TEXT_PROMPT_TEMPLATE_ZH_V1
 )
 
+# Default OpenAI rate limits applied per limiter
+REQUEST_LIMIT = 500
+TOKEN_LIMIT = 200_000
+
 # Initialize the rate limiter
-rate_limiter = ChatRateLimiter(request_limit=500, token_limit=200_000)
+rate_limiter = ChatRateLimiter(request_limit=REQUEST_LIMIT, token_limit=TOKEN_LIMIT)
 
-@rate_limiter.is_limited()
-async def call_openai(messages: List[Dict], openai_llm_endpoint: str = 'gpt-4o-mini') -> str:
+async def call_openai(messages: List[Dict], openai_llm_endpoint: str = 'gpt-4o-mini', limiter: ChatRateLimiter = None) -> str:
     """
     Call OpenAI's API with rate limiting, preparing the parameters and making the API request.
 
     Args:
         messages (List[Dict]): List of messages to send to the model.
         openai_llm_endpoint (str): The model name for the API call (default: 'gpt-4o-mini').
+        limiter (ChatRateLimiter): Rate limiter to apply; defaults to the shared module-level limiter.
 
     Returns:
         str: The response content from the LLM.
@@ -34,7 +38,8 @@ async def call_openai(messages: List[Dict], openai_llm_endpoint: str = 'gpt-4o-m
     )
 
     # Make the API call to OpenAI's chat completion endpoint
-    response  = await client.chat.completions.create(**chat_params)
+    async with (limiter or rate_limiter).limit(**chat_params):
+        response  = await client.chat.completions.create(**chat_params)
 
     return response
 
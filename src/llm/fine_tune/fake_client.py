@@ -0,0 +1,111 @@
+import base64
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+class _FakePage:
+    def __init__(self, data: List, has_more: bool):
+        self.data = data
+        self.has_more = has_more
+
+
+class _FakeFileContent:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def read(self) -> bytes:
+        return self.content
+
+
+class _FakeJobs:
+    def __init__(self, client: "FakeFineTuningClient"):
+        self._client = client
+
+    async def retrieve(self, fine_tuning_job_id: str):
+        self._client.requests.append(("retrieve", fine_tuning_job_id))
+        self._client._maybe_fail(fine_tuning_job_id)
+        return self._client.jobs[fine_tuning_job_id]
+
+    async def list_events(self, fine_tuning_job_id: str, after: Optional[str] = None, limit: int = 20) -> _FakePage:
+        self._client.requests.append(("list_events", fine_tuning_job_id))
+        self._client._maybe_fail(fine_tuning_job_id)
+        # Like the real API: newest first, `after` pages towards older events
+        events = list(reversed(self._client.events[fine_tuning_job_id]))
+        if after is not None:
+            ids = [event.id for event in events]
+            events = events[ids.index(after) + 1:]
+        return _FakePage(events[:limit], has_more=len(events) > limit)
+
+
+class _FakeFiles:
+    def __init__(self, client: "FakeFineTuningClient"):
+        self._client = client
+
+    async def content(self, file_id: str) -> _FakeFileContent:
+        self._client.requests.append(("files.content", file_id))
+        return _FakeFileContent(self._client.file_contents[file_id])
+
+
+class FakeFineTuningClient:
+    """
+    In-memory stand-in for the parts of `openai.AsyncOpenAI` used by `FineTuningEventPoller`.
+
+    Jobs are created with `add_job`, training progress is simulated with `emit_metrics`,
+    and `finish` attaches a base64-encoded result CSV like the real API. `fail_next` makes the
+    next calls for a job raise, to simulate transient API errors. Every call is recorded in
+    `requests` so callers can check how much was fetched.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, SimpleNamespace] = {}
+        self.events: Dict[str, List[SimpleNamespace]] = {}
+        self.file_contents: Dict[str, bytes] = {}
+        self.requests: List = []
+        self.pending_failures: Dict[str, int] = {}
+        self._next_event = 0
+        self.fine_tuning = SimpleNamespace(jobs=_FakeJobs(self))
+        self.files = _FakeFiles(self)
+
+    def fail_next(self, job_id: str, count: int = 1):
+        """Make the next `count` jobs API calls for `job_id` raise a ConnectionError."""
+        self.pending_failures[job_id] = self.pending_failures.get(job_id, 0) + count
+
+    def _maybe_fail(self, job_id: str):
+        if self.pending_failures.get(job_id):
+            self.pending_failures[job_id] -= 1
+            raise ConnectionError(f"Simulated API error for {job_id}")
+
+    def add_job(self, job_id: str, model: str = "gpt-4o-mini-2024-07-18") -> SimpleNamespace:
+        self.jobs[job_id] = SimpleNamespace(id=job_id, model=model, status="running", result_files=[])
+        self.events[job_id] = []
+        self._add_event(job_id, "message", "Fine-tuning job started", None)
+        return self.jobs[job_id]
+
+    def _add_event(self, job_id: str, event_type: str, message: str, data: Optional[Dict]):
+        self._next_event += 1
+        self.events[job_id].append(SimpleNamespace(
+            id=f"ftevent-{self._next_event:08d}",
+            object="fine_tuning.job.event",
+            created_at=int(time.time()),
+            level="info",
+            type=event_type,
+            message=message,
+            data=data,
+        ))
+
+    def emit_metrics(self, job_id: str, step: int, total_steps: int, **metrics: float):
+        data = {"step": step, "total_steps": total_steps, **metrics}
+        self._add_event(job_id, "metrics", f"Step {step}/{total_steps}", data)
+
+    def finish(self, job_id: str, rows: List[Dict], status: str = "succeeded"):
+        """Mark a job as finished, attaching `rows` as its result-metrics CSV."""
+        job = self.jobs[job_id]
+        job.status = status
+        if rows:
+            columns = list(rows[0])
+            lines = [",".join(columns)] + [",".join(str(row.get(column, "")) for column in columns) for row in rows]
+            file_id = f"file-{job_id}-results"
+            self.file_contents[file_id] = base64.b64encode("\n".join(lines).encode("utf-8"))
+            job.result_files = [file_id]
+        self._add_event(job_id, "message", f"Fine-tuning job {status}", None)
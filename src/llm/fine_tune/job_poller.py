@@ -0,0 +1,248 @@
+import asyncio
+import base64
+import binascii
+import csv
+import io
+import json
+import os
+import uuid
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.backend.crud import add_fine_tuning_metrics, get_fine_tuning_metric_keys
+
+# Job statuses after which no new events are emitted
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+
+# Keys in a metrics event or result file row that are not metrics themselves
+_NON_METRIC_KEYS = {"step", "total_steps"}
+
+# Result file columns renamed to the names used by metrics events, so each curve has one name
+RESULT_FILE_COLUMN_NAMES = {
+    "train_accuracy": "train_mean_token_accuracy",
+    "valid_accuracy": "valid_mean_token_accuracy",
+}
+
+
+def _get(obj, key, default=None):
+    """Read a field from either an OpenAI model object or a plain dict."""
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+def _parse_metrics(values: Dict) -> List[Dict]:
+    step = values.get("step")
+    step = int(float(step)) if step not in (None, "") else None
+    metrics = []
+    for metric_name, metric_value in values.items():
+        if metric_name in _NON_METRIC_KEYS or metric_value in (None, ""):
+            continue
+        try:
+            metrics.append({"step": step, "metric_name": metric_name, "metric_value": float(metric_value)})
+        except (TypeError, ValueError):
+            continue
+    return metrics
+
+
+def _decode_result_file(raw: bytes) -> str:
+    # Result files are served as base64-encoded CSV
+    try:
+        return base64.b64decode(raw, validate=True).decode("utf-8")
+    except (binascii.Error, ValueError):
+        return raw.decode("utf-8")
+
+
+class JobCursor:
+    """Incremental ingestion state of one fine-tuning job."""
+
+    def __init__(self, experiment_id: str, last_event_id: Optional[str] = None, result_files_ingested: bool = False):
+        self.experiment_id = uuid.UUID(str(experiment_id))
+        self.last_event_id = last_event_id
+        self.result_files_ingested = result_files_ingested
+
+    def to_dict(self) -> Dict:
+        return {
+            "experiment_id": str(self.experiment_id),
+            "last_event_id": self.last_event_id,
+            "result_files_ingested": self.result_files_ingested,
+        }
+
+
+class FineTuningEventPoller:
+    """
+    Tail fine-tuning job events and result files into `FineTuningMetric`.
+
+    Events are listed newest first, so each poll pages backwards only until it reaches the
+    last event seen for that job; earlier history is never downloaded again. Step metrics from
+    new 'metrics' events are bulk-inserted, and once a job succeeds its result files are read
+    for any steps the events did not cover. Any number of jobs are followed on one event loop.
+
+    A failed poll is logged and retried on the next interval; a job is given up on after
+    `max_consecutive_errors` failed polls in a row, without affecting the other jobs.
+
+    `client` is an `openai.AsyncOpenAI` instance or `FakeFineTuningClient` for local runs.
+    """
+
+    def __init__(
+        self,
+        client,
+        db: Session,
+        poll_interval: float = 30.0,
+        page_size: int = 100,
+        cursor_path: Optional[str] = None,
+        max_consecutive_errors: int = 10,
+    ):
+        self.client = client
+        self.db = db
+        self.poll_interval = poll_interval
+        self.page_size = page_size
+        self.cursor_path = cursor_path
+        self.max_consecutive_errors = max_consecutive_errors
+        self.cursors: Dict[str, JobCursor] = self._load_cursors()
+
+    def _load_cursors(self) -> Dict[str, JobCursor]:
+        if not self.cursor_path or not os.path.exists(self.cursor_path):
+            return {}
+        with open(self.cursor_path, "r", encoding="utf-8") as f:
+            states = json.load(f)
+        # Ignore fields written by older versions (e.g. 'last_step')
+        fields = {"experiment_id", "last_event_id", "result_files_ingested"}
+        return {
+            job_id: JobCursor(**{key: value for key, value in state.items() if key in fields})
+            for job_id, state in states.items()
+        }
+
+    def _save_cursors(self):
+        if not self.cursor_path:
+            return
+        directory = os.path.dirname(self.cursor_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.cursor_path, "w", encoding="utf-8") as f:
+            json.dump({job_id: cursor.to_dict() for job_id, cursor in self.cursors.items()}, f, indent=2)
+
+    def track(self, job_id: str, experiment_id: str) -> JobCursor:
+        """Start following a job, keeping any cursor restored from `cursor_path`."""
+        if job_id not in self.cursors:
+            self.cursors[job_id] = JobCursor(experiment_id)
+        return self.cursors[job_id]
+
+    async def _fetch_new_events(self, job_id: str, cursor: JobCursor) -> List:
+        new_events = []
+        after = None
+        while True:
+            page = await self.client.fine_tuning.jobs.list_events(job_id, after=after, limit=self.page_size)
+            reached_cursor = False
+            for event in page.data:
+                if event.id == cursor.last_event_id:
+                    reached_cursor = True
+                    break
+                new_events.append(event)
+            if reached_cursor or not page.has_more or not page.data:
+                break
+            after = page.data[-1].id
+
+        # Return oldest first so steps are ingested in order
+        new_events.reverse()
+        return new_events
+
+    async def _fetch_result_file_metrics(self, file_id: str) -> List[Dict]:
+        content = await self.client.files.content(file_id)
+        text = _decode_result_file(content.read() if hasattr(content, "read") else content)
+        metrics = []
+        for row in csv.DictReader(io.StringIO(text)):
+            row = {RESULT_FILE_COLUMN_NAMES.get(key.strip(), key.strip()): value for key, value in row.items() if key}
+            metrics.extend(_parse_metrics(row))
+        return metrics
+
+    async def poll_once(self, job_id: str) -> str:
+        """
+        Ingest everything new for one job since the previous poll.
+
+        The cursor only advances once the new metrics are committed, so a poll that fails
+        part-way is simply repeated.
+
+        Returns:
+            str: The job status at the time of the poll.
+        """
+        cursor = self.cursors[job_id]
+        job = await self.client.fine_tuning.jobs.retrieve(job_id)
+        status = _get(job, "status")
+
+        candidates = []
+        events = await self._fetch_new_events(job_id, cursor)
+        for event in events:
+            data = _get(event, "data")
+            if _get(event, "type") == "metrics" and data:
+                candidates.extend(_parse_metrics(dict(data)))
+
+        # Result files repeat steps already reported by events (and may fill steps they skipped)
+        ingest_result_files = status == "succeeded" and not cursor.result_files_ingested
+        if ingest_result_files:
+            for file_id in _get(job, "result_files") or []:
+                candidates.extend(await self._fetch_result_file_metrics(file_id))
+
+        # Everything is deduplicated against what is already stored: without a persisted cursor
+        # a restarted poller sees every event again
+        new_metrics = []
+        if candidates:
+            seen = get_fine_tuning_metric_keys(self.db, cursor.experiment_id)
+            for metric in candidates:
+                key = (metric["step"], metric["metric_name"])
+                if key not in seen:
+                    seen.add(key)
+                    new_metrics.append(metric)
+
+        if new_metrics:
+            add_fine_tuning_metrics(self.db, cursor.experiment_id, new_metrics)
+            steps = [metric["step"] for metric in new_metrics if metric["step"] is not None]
+            print(f"{job_id}: ingested {len(new_metrics)} metrics" + (f" up to step {max(steps)}" if steps else ""))
+
+        if events:
+            cursor.last_event_id = events[-1].id
+        if ingest_result_files:
+            cursor.result_files_ingested = True
+        self._save_cursors()
+        return status
+
+    async def follow(self, job_id: str) -> str:
+        """
+        Poll one job until it reaches a terminal status.
+
+        Returns:
+            str: The terminal status, or 'error' after `max_consecutive_errors` failed polls.
+        """
+        consecutive_errors = 0
+        while True:
+            try:
+                status = await self.poll_once(job_id)
+                consecutive_errors = 0
+            except Exception as e:
+                self.db.rollback()
+                consecutive_errors += 1
+                print(f"{job_id}: poll failed ({consecutive_errors}/{self.max_consecutive_errors}): {e}")
+                if consecutive_errors >= self.max_consecutive_errors:
+                    return "error"
+                status = None
+
+            if status in TERMINAL_STATUSES:
+                print(f"{job_id}: finished with status '{status}'")
+                return status
+            await asyncio.sleep(self.poll_interval)
+
+    async def run(self, jobs: Dict[str, str]) -> Dict[str, str]:
+        """
+        Follow many jobs concurrently until all of them finish.
+
+        Args:
+            jobs (Dict[str, str]): Fine-tuning job ID -> `FineTuningExperiment` ID.
+
+        Returns:
+            Dict[str, str]: Final status per job ID.
+        """
+        for job_id, experiment_id in jobs.items():
+            self.track(job_id, experiment_id)
+        statuses = await asyncio.gather(*[self.follow(job_id) for job_id in jobs])
+        return dict(zip(jobs, statuses))
@@ -0,0 +1,87 @@
+"""
+Run `FineTuningEventPoller` end to end against `FakeFineTuningClient` and an in-memory SQLite DB.
+
+Usage:
+    python -m src.llm.fine_tune.simulate
+
+Exits non-zero if the ingested metrics are not exactly what the fake jobs reported, including
+after a second poller without a saved cursor replays both jobs.
+"""
+import asyncio
+from collections import Counter
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.backend.crud import add_fine_tuning_experiment
+from src.backend.models import Base, FineTuningMetric
+from src.llm.fine_tune.fake_client import FakeFineTuningClient
+from src.llm.fine_tune.job_poller import FineTuningEventPoller
+
+POLL_INTERVAL = 0.01
+
+
+async def _train_sparse_events(client: FakeFineTuningClient, job_id: str):
+    # Events only report every 10th step; the result file has every step
+    for step in (10, 20, 30):
+        client.emit_metrics(job_id, step, 30, train_loss=1 / step, train_mean_token_accuracy=step / 30)
+        await asyncio.sleep(POLL_INTERVAL * 3)
+    client.finish(job_id, [
+        {"step": step, "train_loss": 1 / step, "train_accuracy": step / 30, "valid_loss": ""}
+        for step in range(1, 31)
+    ])
+
+
+async def _train_then_fail(client: FakeFineTuningClient, job_id: str):
+    for step in range(1, 6):
+        client.emit_metrics(job_id, step, 5, train_loss=1 / step, train_mean_token_accuracy=step / 5)
+        await asyncio.sleep(POLL_INTERVAL)
+    client.finish(job_id, [], status="failed")
+
+
+async def simulate(db) -> dict:
+    client = FakeFineTuningClient()
+    client.add_job("ftjob-sparse")
+    client.add_job("ftjob-flaky")
+    # Transient API errors must be retried without aborting the other job
+    client.fail_next("ftjob-flaky", 3)
+
+    experiments = {
+        job_id: add_fine_tuning_experiment(db, "gpt-4o-mini-2024-07-18", job_id, 1, 1.0, 0.0).id
+        for job_id in client.jobs
+    }
+    poller = FineTuningEventPoller(client, db, poll_interval=POLL_INTERVAL, page_size=2)
+    statuses, _, _ = await asyncio.gather(
+        poller.run(experiments),
+        _train_sparse_events(client, "ftjob-sparse"),
+        _train_then_fail(client, "ftjob-flaky"),
+    )
+
+    # A restarted poller without a cursor file replays every event and result file;
+    # none of it may be inserted twice
+    restarted = FineTuningEventPoller(client, db, poll_interval=POLL_INTERVAL, page_size=2)
+    assert await restarted.run(experiments) == statuses
+    return {"statuses": statuses, "experiments": experiments}
+
+
+def main():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    result = asyncio.run(simulate(db))
+    assert result["statuses"] == {"ftjob-sparse": "succeeded", "ftjob-flaky": "failed"}, result["statuses"]
+
+    for job_id, expected_steps in (("ftjob-sparse", 30), ("ftjob-flaky", 5)):
+        rows = db.query(FineTuningMetric).filter(FineTuningMetric.experiment_id == result["experiments"][job_id]).all()
+        keys = Counter((row.step, row.metric_name) for row in rows)
+        assert all(count == 1 for count in keys.values()), f"{job_id}: duplicate metrics {keys.most_common(3)}"
+        assert {name for _, name in keys} == {"train_loss", "train_mean_token_accuracy"}, f"{job_id}: {set(keys)}"
+        assert {step for step, _ in keys} == set(range(1, expected_steps + 1)), f"{job_id}: missing steps"
+        print(f"{job_id}: {len(rows)} metrics over {expected_steps} steps, no duplicates")
+
+    print("Fine-tuning poller simulation passed.")
+
+
+if __name__ == "__main__":
+    main()
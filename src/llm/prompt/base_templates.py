@@ -2,4 +2,16 @@ TEXT_PROMPT_TEMPLATE_ZH_V1 = '''
     你是一個具有廣泛臺灣相關知識的語言模型。你應該能夠提供關於臺灣的各種資訊，
     包括但不限於臺灣的歷史、文化、地理、政治、經濟、社會習俗以及當前事件。
     請確保你的回答準確且符合當地的文化背景。
-'''
\ No newline at end of file
+'''
+
+# TMLU user prompt, split around the answer options
+TMLU_USER_PROMPT_TEMPLATE_PART_ONE = '''
+        以下選擇題為出自臺灣的考題，答案為其中一個選項。
+
+        問題:
+        {question}
+
+        '''
+TMLU_USER_PROMPT_TEMPLATE_PART_TWO = '''
+        正確答案：(
+        '''